@@ -3,14 +3,150 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from pscs_api.exceptions import PreviousNodesNotRun, NodeRequirementsNotMet, NodeException
 from warnings import warn
-import re
+import os
+import heapq
+import hashlib
+import pickle
+import itertools
+import threading
 from copy import deepcopy
 from typing import Collection
-from collections import defaultdict as dd
+from collections import defaultdict as dd, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
 import anndata as ad
 from pscs_api.interactions import istr, interaction_fstring, interaction_pattern, interaction_parameter_string
+from pscs_api.interactions import interaction_regex
 from pscs_api.interactions import Interaction, InteractionList
 
+_node_pools = dd(deque)  # released nodes available for reuse, keyed by class
+_node_pool_lock = threading.Lock()
+_result_lock = threading.Lock()  # guards the bookkeeping of which successors have copied a result
+_running = threading.local()  # node being run by the pipeline in the current thread, and whether the run is incremental
+_active_nodes = set()  # nodes currently being run by a pipeline, in any thread; guarded by _result_lock
+_graph_version = 0  # incremented whenever node connections or interactions change; used to invalidate cached values
+
+
+def _bump_graph_version():
+    """Invalidates values that were cached from the connections and interactions of the nodes."""
+    global _graph_version
+    _graph_version += 1
+    return
+
+
+def _topological_sort(nodes: Collection[PipelineNode]) -> list:
+    """
+    Sorts the nodes such that each node comes after all of the nodes that precede it (Kahn's algorithm).
+    Parameters
+    ----------
+    nodes : Collection[PipelineNode]
+        Nodes to sort.
+    Returns
+    -------
+    list
+        Sorted list of nodes.
+    Raises
+    ------
+    NodeException
+        If some of the nodes are part of a cycle, or follow one, and so can't be sorted.
+    """
+    # Predecessors that aren't being sorted don't hold up their successors
+    pending_preds = dict.fromkeys(nodes, 0)
+    for node in pending_preds:
+        pending_preds[node] = sum(1 for prev in node._previous if prev in pending_preds)
+    ready_list = deque(node for node, num_pending in pending_preds.items() if num_pending == 0)
+    order = []
+    while len(ready_list) > 0:
+        node = ready_list.popleft()
+        order.append(node)
+        for next_node in node._next:
+            if next_node in pending_preds:
+                pending_preds[next_node] -= 1
+                if pending_preds[next_node] == 0:
+                    ready_list.append(next_node)
+    if len(order) < len(pending_preds):
+        leftover = next(node for node, num_pending in pending_preds.items() if num_pending > 0)
+        raise NodeException(ValueError("The node is part of a cycle, or follows one."), node=leftover)
+    return order
+
+
+def _ancestors(node: PipelineNode) -> set:
+    """Collects the node and the nodes preceding it whose depth isn't known yet, without recursing."""
+    ancestors = {node}
+    to_visit = [node]
+    while len(to_visit) > 0:
+        for prev in to_visit.pop()._previous:
+            if prev not in ancestors and prev._depth is None:
+                ancestors.add(prev)
+                to_visit.append(prev)
+    return ancestors
+
+
+def _compute_depths(order: list):
+    """Sets the depth of the nodes in a single pass; order must be topologically sorted."""
+    for node in order:
+        if isinstance(node, InputNode) or len(node._previous) == 0:
+            node._depth = 0
+        else:
+            # Predecessors that weren't sorted along with the node get their depth on their own
+            node._depth = max([prev._depth if prev._depth is not None else prev.depth for prev in node._previous]) + 1
+    return
+
+
+def _resolve_parameter_string(pstr: str, parameters: dict) -> list:
+    """Replaces the parameter names in pstr with their values; Collection values produce one string per value."""
+    resolved_strings = []
+    # Fully resolve the string
+    parameter_names = interaction_regex.findall(pstr)
+    resolving_str = pstr
+    for pname in parameter_names:
+        parameter_values = parameters[pname]
+        to_replace = istr(pname)
+        if isinstance(parameter_values, Collection) and not isinstance(parameter_values, str):
+            for pvalue in parameter_values:
+                if pvalue is not None:
+                    replace_with = str(pvalue)
+                    subresolving_str = resolving_str.replace(to_replace, replace_with)
+                    # Resolve remainder
+                    resolved_strings += _resolve_parameter_string(subresolving_str, parameters)
+                else:
+                    continue
+            return resolved_strings
+        else:
+            if parameter_values is not None:
+                resolving_str = resolving_str.replace(to_replace, str(parameter_values))
+            else:
+                return [None]
+    return resolved_strings + [resolving_str]
+
+
+@lru_cache(maxsize=1024)
+def _resolve_template(pstr: str, parameter_items: tuple) -> tuple:
+    """Cached version of _resolve_parameter_string; parameter_items holds the (name, value) pairs used by pstr."""
+    return tuple(_resolve_parameter_string(pstr, dict(parameter_items)))
+
+
+def _freeze(value):
+    """
+    Converts a parameter value to the strings that would be substituted for it, so that it can be used as a cache key.
+    Values such as 1, 1.0 and True compare equal but are substituted differently, so they can't be used directly.
+    """
+    if isinstance(value, Collection) and not isinstance(value, str):
+        return tuple(None if v is None else str(v) for v in value)
+    return None if value is None else str(value)
+
+
+def _unique_interactions(interactions) -> list:
+    """Removes duplicate interactions, keeping the first occurrence of each."""
+    seen = set()
+    unique = []
+    for interaction in interactions:
+        key = tuple(getattr(interaction, name) for name in Interaction._SLOTS)
+        if key not in seen:
+            seen.add(key)
+            unique.append(interaction)
+    return unique
+
 
 class _ResultList:
     def __init__(self, elements):
@@ -24,23 +160,80 @@ class PipelineNode(ABC):
     """
     Class for describing an individual pipeline segment, with all necessary classes indicated.
     """
+    # effects and requirements are overridden as class attributes by subclasses, so they can't be slots; they are kept
+    # in the instance __dict__, which is declared here so that subclasses that declare __slots__ still have one.
+    __slots__ = ("__dict__", "has_run", "parameters", "_next", "_previous", "_result", "_result_version",
+                 "_input_fingerprint", "_copied_by", "_result_owner", "_depth", "_remaining_preds", "_raw_effects",
+                 "_raw_requirements", "_resolved_parameters", "_cumul_effect_cache", "_cumul_effect_version",
+                 "_cumul_requirements_cache", "_cumul_requirements_version")
     important_parameters = None  # parameters to prioritize for display
+    _pscs_role = None  # "input"/"output" for the input and output prototypes; lets the parser skip issubclass
     num_inputs = 1
     num_outputs = 1
     effects = InteractionList()
     requirements = InteractionList()
 
     def __init__(self):
+        self._reset_state()
+        return
+
+    @classmethod
+    def acquire(cls, *args, **kwargs):
+        """
+        Creates a node of this class, reusing a previously released node if one is available. Arguments are passed
+        to the class's __init__.
+        Returns
+        -------
+        PipelineNode
+            Initialized node.
+        """
+        with _node_pool_lock:
+            pool = _node_pools[cls]
+            node = pool.pop() if len(pool) > 0 else None
+        if node is None:
+            return cls(*args, **kwargs)
+        node.__init__(*args, **kwargs)
+        return node
+
+    def release(self):
+        """
+        Clears the node's state and returns it to its class's pool so that it can be reused by `acquire`. The node
+        should no longer be used, and should not be connected to nodes that are still in use.
+        Returns
+        -------
+        None
+        """
+        # Attributes outside of the slots (e.g. those set by a subclass's __init__) must not carry over to the next use
+        for name in list(self.__dict__):
+            if name not in ("effects", "requirements"):
+                del self.__dict__[name]
+        self._reset_state()
+        with _node_pool_lock:
+            _node_pools[type(self)].append(self)
+        return
+
+    def _reset_state(self):
+        """Sets the node's initial state; also drops parameters, connections, and results when the node is pooled."""
         self.has_run = False  # whether the node has been run
         self.parameters = {}  # settings used to run the node's code
-        self.effects = deepcopy(self.effects)  # convert to instance variable
-        self.requirements = deepcopy(self.requirements)  # convert to instance variable
+        self.effects = type(self).effects.clone()  # convert to instance variable
+        self.requirements = type(self).requirements.clone()  # convert to instance variable
         self._next = []  # list of nodes that follow this one
         self._previous = []  # list of nodes that lead to this node
         self._result = None  # stored output
+        self._result_version = 0  # incremented whenever the stored output is replaced
+        self._input_fingerprint = None  # parameters and input versions used to produce the stored output
+        self._copied_by = set()  # successors that have finished copying the stored output
+        self._result_owner = None  # successor that was handed the stored output instead of a copy
         self._depth = None  # how far from the input this node is
+        self._remaining_preds = 0  # number of preceding nodes that have yet to finish in the current run
         self._raw_effects = None
         self._raw_requirements = None
+        self._resolved_parameters = None  # parameters with which the interactions were last resolved
+        self._cumul_effect_cache = None  # cached value of cumulative_effect
+        self._cumul_effect_version = -1  # graph version at which the cached value was computed
+        self._cumul_requirements_cache = None
+        self._cumul_requirements_version = -1
         return
 
     @abstractmethod
@@ -62,48 +255,108 @@ class PipelineNode(ABC):
                 self.parameters[param] = value
 
     @property
-    def cumulative_effect(self) -> Interaction:
+    def cumulative_effect(self) -> InteractionList:
         """
-        Gets the _effect of all preceding nodes, appends its own _effect, and returns the list
+        Gets the _effect of all preceding nodes, appends its own _effect, and returns the list. Each path leading to
+        this node contributes its own alternative, and identical alternatives are kept once. The value is cached until
+        connections or interactions change.
         Returns
         -------
-        Interaction
+        InteractionList
             The cumulative effects of all nodes up to this point, including the current node.
         """
-        cumul = Interaction()
-        for prev in self._previous:
-            cumul += prev.cumulative_effect
-        return cumul + self.effects
+        graph_version = _graph_version  # read first, so that changes made during the computation invalidate it
+        if self._cumul_effect_cache is None or self._cumul_effect_version != graph_version:
+            cumul = InteractionList()
+            for prev in self._previous:
+                cumul.interactions += prev.cumulative_effect.interactions
+            # Paths that carry the same interactions are the same alternative; keeping both grows exponentially
+            cumul.interactions = _unique_interactions(cumul.interactions)
+            cumul = cumul * self.effects
+            cumul.interactions = _unique_interactions(cumul.interactions)
+            self._cumul_effect_cache = cumul
+            self._cumul_effect_version = graph_version
+        return self._cumul_effect_cache
 
     @property
-    def cumulative_requirements(self) -> Interaction:
+    def cumulative_requirements(self) -> InteractionList:
         """
         Gets the _requirements of all preceding nodes, appends its own _requirements, and returns the list. This is most
-        useful when compared with a node's cumulative _effect.
+        useful when compared with a node's cumulative _effect. The value is cached until connections or interactions
+        change.
         Returns
         -------
-        Interaction
+        InteractionList
             The cumulative requirements of all nodes up to this point, including the current node.
         """
-        requirements = Interaction()
-        for prev in self._previous:
-            requirements += prev.cumulative_requirements
-        return requirements + self.requirements
+        graph_version = _graph_version  # read first, so that changes made during the computation invalidate it
+        if self._cumul_requirements_cache is None or self._cumul_requirements_version != graph_version:
+            requirements = InteractionList()
+            for prev in self._previous:
+                requirements.interactions += prev.cumulative_requirements.interactions
+            # Paths that carry the same interactions are the same alternative; keeping both grows exponentially
+            requirements.interactions = _unique_interactions(requirements.interactions)
+            requirements = requirements * self.requirements
+            requirements.interactions = _unique_interactions(requirements.interactions)
+            self._cumul_requirements_cache = requirements
+            self._cumul_requirements_version = graph_version
+        return self._cumul_requirements_cache
 
     @property
     def result(self):
+        reader = getattr(_running, "node", None)
+        if reader is not None and getattr(_running, "incremental", False):
+            # Results are kept for later incremental runs, so successors get a copy that they can modify
+            return deepcopy(self._result)
         # Check if we have multiple outputs
         if len(self._next) > 1:
-            # Return a copy of the data to prevent cross-contamination
-            return deepcopy(self._result)
-        else:
-            return self._result
+            # Return a copy of the data to prevent cross-contamination. A successor can have the stored output once
+            # every other successor has finished copying it and is done running, since none of them can read it again.
+            # A successor connected more than once reads the output once per connection, so it always gets copies.
+            with _result_lock:
+                if self._result_owner is None and self._next.count(reader) == 1:
+                    others = set(self._next)
+                    others.discard(reader)
+                    if others <= self._copied_by and others.isdisjoint(_active_nodes):
+                        self._result_owner = reader
+                is_owner = reader is not None and reader is self._result_owner
+            if is_owner:
+                return self._result
+            result_copy = deepcopy(self._result)
+            if reader in self._next:
+                with _result_lock:
+                    self._copied_by.add(reader)
+            return result_copy
+        return self._result
 
     @result.setter
     def result(self, value):
         self._result = value
+        self._result_version += 1
+        with _result_lock:
+            self._copied_by = set()
+            self._result_owner = None
         return
 
+    def _parameters_key(self):
+        """
+        Summarizes the node's parameters; used to detect parameter changes. Parameters that can't be pickled produce a
+        key that doesn't match any other, so that they are always considered changed.
+        """
+        try:
+            pickled = pickle.dumps(sorted(self.parameters.items()), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return object()
+        return hashlib.sha1(pickled).digest()
+
+    def _fingerprint(self) -> tuple:
+        """Summarizes the node's parameters and the versions of its inputs."""
+        return self._parameters_key(), tuple((prev, prev._result_version) for prev in self._previous)
+
+    def _is_up_to_date(self) -> bool:
+        """Whether the node has run with its current parameters and inputs, such that its result can be reused."""
+        return self.has_run and self._result is not None and self._input_fingerprint == self._fingerprint()
+
     @property
     def is_complete(self) -> bool:
         return self._result is not None
@@ -119,13 +372,10 @@ class PipelineNode(ABC):
     @property
     def depth(self) -> int:
         """How far away the node is from the input."""
-        # This function is recursive; this prevents an infinite loop if the user has a cycle in their pipeline.
-        if self._depth is not None:
-            return self._depth
-        if isinstance(self, InputNode):
-            self._depth = 0
-            return self._depth
-        self._depth = max([n.depth for n in self._previous]) + 1
+        # Depths are computed iteratively, along with those of the preceding nodes that don't have one yet; nodes that
+        # are part of a cycle raise.
+        if self._depth is None:
+            _compute_depths(_topological_sort(_ancestors(self)))
         return self._depth
 
     @property
@@ -138,7 +388,8 @@ class PipelineNode(ABC):
 
     def connect_to_output(self, node):
         """
-        Connects the output of this node to the input of the specified node.
+        Connects the output of this node to the input of the specified node. Connecting the same nodes again adds
+        another connection, e.g. to feed two inputs of the node from this node's output.
         Parameters
         ----------
         node : PipelineNode
@@ -149,11 +400,13 @@ class PipelineNode(ABC):
         """
         self._next.append(node)
         node._previous.append(self)
+        _bump_graph_version()
         return
 
     def connect_to_input(self, node):
         """
-        Connects the input of this node to the output of the specified node.
+        Connects the input of this node to the output of the specified node. Connecting the same nodes again adds
+        another connection, as with connect_to_output.
         Parameters
         ----------
         node : PipelineNode
@@ -164,92 +417,103 @@ class PipelineNode(ABC):
         None
         """
         self._previous.append(node)
-        node._next.append(node)
+        node._next.append(self)
+        _bump_graph_version()
         return
 
     def reset(self):
-        """Resets the output value of the node."""
+        """Resets the output value of the node, along with the values it cached from the pipeline."""
         self.result = None
+        self.has_run = False
+        self._input_fingerprint = None
+        self._depth = None
+        self._resolved_parameters = None
+        self._cumul_effect_cache = None
+        self._cumul_requirements_cache = None
         return
 
     def check_requirements_met(self,
                                effects: InteractionList = None,
                                reqs: InteractionList = None) -> bool:
+        """
+        Checks whether requirements are met by the cumulative effect of this node and the nodes preceding it.
+        Parameters
+        ----------
+        effects : InteractionList
+            Additional effects to consider on top of the cumulative effect. Default: None.
+        reqs : InteractionList
+            Requirements to check. Default: the node's own requirements.
+        Returns
+        -------
+        bool
+            Whether the requirements are met along at least one path leading to this node.
+        """
         if isinstance(effects, Interaction):
             effects = InteractionList(effects)
         if isinstance(reqs, Interaction):
             reqs = InteractionList(reqs)
 
-        if effects is None:
-            effects = InteractionList()
         if reqs is None:
             reqs = self.requirements
-        effects.product(self.effects)
-        if effects >= reqs:
-            return True
-        else:
-            reqs_met = False
-            for prev in self._previous:
-                reqs_met = prev.check_requirements_met(effects=effects, reqs=reqs)
-                if reqs_met:
-                    break
-            return reqs_met
+        cumul = self.cumulative_effect
+        if effects is not None:
+            cumul = cumul * effects
+        return cumul >= reqs
+
+    def _unmet_requirements(self) -> list:
+        """
+        Lists, for each alternative in the node's requirements, the entries that no path leading to this node provides.
+        Only used to report failures, so the set differences are computed only once validation has failed.
+        """
+        available = Interaction()
+        for effect in self.cumulative_effect:
+            available.add(effect)
+        available = available.as_dict()
+        unmet = []
+        for req in self.requirements:
+            missing = {attr: sorted(set(values).difference(available[attr])) for attr, values in req.as_dict().items()}
+            unmet.append({attr: values for attr, values in missing.items() if len(values) > 0})
+        return unmet
 
     def resolve_interactions(self):
         """Resolves effects/requirements that are parameter-dependent into their finalized values."""
         # Store raw value in case parameters change and the interactions need to be resolved again
         if self._raw_effects is None:
-            self._raw_effects = deepcopy(self.effects)
+            self._raw_effects = self.effects.clone()
         if self._raw_requirements is None:
-            self._raw_requirements = deepcopy(self.requirements)
-        # Restore raw values
-        self.effects = deepcopy(self._raw_effects)
-        self.requirements = deepcopy(self._raw_requirements)
-        # Resolve effects
-        for meta_interaction in [self.effects, self.requirements]:
-            for interaction in meta_interaction:
-                for v in vars(interaction):
-                    to_swap = dd(list)
-                    for val in getattr(interaction, v):
-                        to_swap[val] += self._resolve_parameter_string(val)
-                    for val_match, param_value in to_swap.items():
-                        # param_value might be Collection, and each should be considered a separate requirement
-                        interaction_set = getattr(interaction, v)
-                        if isinstance(param_value, Collection) and not isinstance(param_value, str):
-                            interaction_set.discard(val_match)
-                            for param_subvalue in param_value:
-                                if param_subvalue is not None:
-                                    interaction_set.add(param_subvalue)
-                        else:
-                            interaction_set.discard(val_match)
-                            if param_value is not None:
-                                interaction_set.add(param_value)
+            self._raw_requirements = self.requirements.clone()
+        parameters_key = self._parameters_key()
+        if parameters_key == self._resolved_parameters:
+            return  # already resolved with these parameter values
+        self.effects = self._resolve_interaction_list(self._raw_effects)
+        self.requirements = self._resolve_interaction_list(self._raw_requirements)
+        self._resolved_parameters = parameters_key
+        _bump_graph_version()
         return
 
+    def _resolve_interaction_list(self, raw_interactions: InteractionList) -> InteractionList:
+        """Builds a new InteractionList in which the parameter-dependent values of raw_interactions are resolved."""
+        resolved = InteractionList()
+        for raw_interaction in raw_interactions:
+            resolved_values = {}
+            for name in Interaction._SLOTS:
+                resolved_values[name] = set()
+                for val in getattr(raw_interaction, name):
+                    # Parameters might be Collections, and each value should be considered a separate entry
+                    for param_value in self._resolve_parameter_string(val):
+                        if param_value is not None:
+                            resolved_values[name].add(param_value)
+            resolved.interactions.append(Interaction(**resolved_values))
+        return resolved
+
     def _resolve_parameter_string(self, pstr: str):
-        resolved_strings = []
-        # Fully resolve the string
-        parameter_names = re.findall(interaction_pattern, pstr)
-        resolving_str = pstr
-        for pname in parameter_names:
-            parameter_values = self.parameters[pname]
-            to_replace = istr(pname)
-            if isinstance(parameter_values, Collection) and not isinstance(parameter_values, str):
-                for pvalue in parameter_values:
-                    if pvalue is not None:
-                        replace_with = str(pvalue)
-                        subresolving_str = resolving_str.replace(to_replace, replace_with)
-                        # Resolve remainder
-                        resolved_strings += self._resolve_parameter_string(subresolving_str)
-                    else:
-                        continue
-                return resolved_strings
-            else:
-                if parameter_values is not None:
-                    resolving_str = resolving_str.replace(to_replace, str(parameter_values))
-                else:
-                    return [None]
-        return resolved_strings + [resolving_str]
+        # Only the parameters named in the string affect the result; use their values to look up previous resolutions
+        parameter_names = interaction_regex.findall(pstr)
+        try:
+            parameter_items = tuple((pname, _freeze(self.parameters[pname])) for pname in parameter_names)
+            return list(_resolve_template(pstr, parameter_items))
+        except TypeError:  # unhashable parameter values; resolve without caching
+            return _resolve_parameter_string(pstr, self.parameters)
 
     def _terminate(self,
                    result=None):
@@ -265,6 +529,11 @@ class PipelineNode(ABC):
         None
         """
         self.result = result
+        # Only incremental runs reuse results, and only their successors are guaranteed not to modify them
+        if getattr(_running, "incremental", False):
+            self._input_fingerprint = self._fingerprint()
+        else:
+            self._input_fingerprint = None
         if not isinstance(result, ad.AnnData):
             warn(f"Node {self} at depth {self.depth} is passing data downstream that is not an AnnData object. "
                  f"Compatability with other nodes is not guaranteed and may result in unanticipated downstream effects.")
@@ -276,10 +545,9 @@ class InputNode(PipelineNode):
     """
     Input node prototype; serves to indicate that the node loads data from disk.
     """
+    __slots__ = ()
+    _pscs_role = "input"
     num_inputs = 0
-    def __init__(self):
-        super().__init__()
-        self.num_inputs = 0
 
     def connect_to_input(self, node):
         raise ValueError(f"This node doesn't receive input.")
@@ -289,13 +557,11 @@ class OutputNode(PipelineNode):
     """
     Output node prototype; serves to indicate that the node produces a file to disk.
     """
+    __slots__ = ()
+    _pscs_role = "output"
     num_outputs = 0
     interactive_tag = ""  # if the output is intended to be used for an interactive app, supply the tag(s) here
 
-    def __init__(self):
-        super().__init__()
-        self.num_outputs = 0
-
     def connect_to_output(self, node):
         raise ValueError(f"This node doesn't have an output to be received.")
 
@@ -315,35 +581,195 @@ class Pipeline:
             Nodes indexed by their ID. Default: None    .
         """
         self.pipeline = nodes
+        self._validated_key = None  # graph key (see _graph_key) at which the pipeline last passed validation
+        self._topo_order = None  # nodes sorted such that each node comes after its predecessors
+        self._topo_key = None  # graph key at which the order was computed
         return
 
-    def run(self):
-        # Get how many are ready, how many are done
+    @staticmethod
+    def bulk_connect(edges: Collection[tuple[PipelineNode, PipelineNode]]) -> None:
+        """
+        Connects the output of each source node to the input of its destination node, as
+        source.connect_to_output(destination) does, but invalidates the cached graph values only once for the batch.
+        Parameters
+        ----------
+        edges : Collection[tuple[PipelineNode, PipelineNode]]
+            Pairs of (source, destination) nodes. Each pair adds a connection, even if the nodes are already connected.
+        Returns
+        -------
+        None
+        """
+        added = False
+        for src, dst in edges:
+            if type(src).connect_to_output is not PipelineNode.connect_to_output:
+                src.connect_to_output(dst)  # respect nodes that restrict or extend how they are connected
+                continue
+            src._next.append(dst)
+            dst._previous.append(src)
+            added = True
+        if added:
+            _bump_graph_version()
+        return
+
+    def _graph_key(self) -> tuple:
+        """Identifies the current state of the pipeline: the graph version and the nodes that are in the pipeline."""
+        return _graph_version, tuple(self.pipeline.values())
+
+    def _topological_order(self) -> list:
+        """Returns the nodes in topological order; the order is only recomputed if the nodes or connections changed."""
+        graph_key = self._graph_key()
+        if self._topo_order is None or self._topo_key != graph_key:
+            self._topo_order = _topological_sort(self.pipeline.values())
+            self._topo_key = graph_key
+        return self._topo_order
+
+    def run(self, parallel: bool = True, incremental: bool = False):
+        """
+        Runs the nodes of the pipeline. A node is started as soon as all of the nodes preceding it have finished, so
+        that a slow branch doesn't hold up the rest of the pipeline. Independent nodes are run concurrently unless
+        `parallel` is False.
+        Parameters
+        ----------
+        parallel : bool
+            Whether to run independent nodes concurrently in a thread pool. If False, nodes are run one at a time in
+            topological order. Default: True.
+        incremental : bool
+            Whether to rerun nodes that have already run if their parameters or inputs have changed since. Nodes whose
+            parameters and inputs are unchanged keep their results; successors are given copies of the results so that
+            they stay unchanged. Results from runs that weren't incremental are not reused. If False, nodes that have
+            already run are skipped. Default: False.
+        Raises
+        ------
+        NodeException
+            If a node raises an exception, or if a node can't be run because a predecessor outside of the pipeline has
+            no result or because it is part of a cycle.
+        Returns
+        -------
+        None
+        """
+        # Count how many predecessors each node is waiting on; nodes waiting on none are ready. Predecessors outside
+        # of the pipeline aren't run by it, so they must already have a result.
+        members = dict.fromkeys(self.pipeline.values())  # ordered, in case a node is listed more than once
+        for node in members:
+            for prev in node._previous:
+                if prev not in members and not prev.is_complete:
+                    raise NodeException(PreviousNodesNotRun(f"{prev} is not part of the pipeline and has no result."),
+                                        node=node)
+            node._remaining_preds = sum(1 for prev in node._previous if prev in members)
+        if not parallel:
+            for node in self._topological_order():
+                if not self._can_skip(node, incremental):
+                    self._run_node(node, incremental)
+            return
+        # Ready nodes are kept in a heap so that those with the most successors, which unblock the most work, go first
         ready_list = []
-        for _, node in self.pipeline.items():
-            if node.is_ready:
-                ready_list.append(node)
-        while len(ready_list) > 0:
-            run_list = ready_list
-            ready_list = []
-            for node in run_list:
-                if not node.has_run:  # prevent circular execution
-                    try:
-                        node.run()
-                        if not node.has_run and node.result is not None:
-                            warn(f"Node {node} at depth {node.depth} did not terminate correctly. The `_terminate()` method should be "
-                                 f"called after node execution is complete. The node produced results, so the pipeline will continue "
-                                 f"executing. Please contact the developers to fix the issue.")
-                        elif node.result is None and not isinstance(node, OutputNode):
-                            raise NodeException(ValueError(f"A node did not produce results. Pipeline halted."), node=node)
-                    except Exception as e:
-                        raise NodeException(e, node=node)
-                for next_node in node._next:
-                    if next_node.is_ready and not next_node.has_run:
-                        ready_list.append(next_node)
+        insertion_order = itertools.count()  # keeps ties in the order the nodes became ready
+        for node in members:
+            if node._remaining_preds == 0:
+                heapq.heappush(ready_list, (-len(node._next), next(insertion_order), node))
+        running = {}  # futures of the nodes currently being run
+        num_finished = 0
+        executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        try:
+            while len(ready_list) > 0 or len(running) > 0:
+                finished = []
+                while len(ready_list) > 0:
+                    _, _, node = heapq.heappop(ready_list)
+                    if self._can_skip(node, incremental):
+                        finished.append(node)
+                    else:
+                        running[executor.submit(self._run_node, node, incremental)] = node
+                if len(finished) == 0:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        fut.result()  # re-raises the node's exception, if any
+                        finished.append(running.pop(fut))
+                # Dispatch the successors that were only waiting on the finished nodes
+                num_finished += len(finished)
+                for node in finished:
+                    for next_node in node._next:
+                        if next_node not in members:
+                            continue
+                        next_node._remaining_preds -= 1
+                        if next_node._remaining_preds == 0:
+                            heapq.heappush(ready_list, (-len(next_node._next), next(insertion_order), next_node))
+        finally:
+            executor.shutdown(cancel_futures=True)
+        if num_finished < len(members):
+            # The remaining nodes wait on each other
+            stuck = next(node for node in members if node._remaining_preds > 0)
+            raise NodeException(PreviousNodesNotRun("the node is part of a cycle, or follows one."), node=stuck)
+        return
+
+    @staticmethod
+    def _can_skip(node: PipelineNode, incremental: bool) -> bool:
+        """Whether the node's existing result should be kept instead of running the node."""
+        if incremental:
+            return node._is_up_to_date()
+        return node.has_run  # prevent circular execution
+
+    def compute_depths(self):
+        """Sets the depth of every node in the pipeline in a single pass, without recursing through the nodes."""
+        _compute_depths(self._topological_order())
+        return
+
+    def validate(self):
+        """
+        Checks that the requirements of every node are met by the effects of the nodes preceding it. Nodes are checked
+        in topological order so that each node's cumulative effect is built from the cached values of its predecessors.
+        Validation is skipped if no nodes, connections or interactions have changed since the pipeline last passed.
+        Raises
+        ------
+        NodeException
+            If the requirements of a node are not met.
+        Returns
+        -------
+        None
+        """
+        graph_key = self._graph_key()
+        if self._validated_key == graph_key:
+            return
+        for node in self._topological_order():
+            if not node.check_requirements_met():
+                raise NodeException(NodeRequirementsNotMet(unmet_reqs=node._unmet_requirements(),
+                                                           reqs=node.requirements.as_list()),
+                                    node=node)
+        self._validated_key = graph_key
+        return
+
+    @staticmethod
+    def _run_node(node: PipelineNode, incremental: bool = False):
+        """Runs a single node and checks that it produced results."""
+        _running.node = node
+        _running.incremental = incremental
+        with _result_lock:
+            _active_nodes.add(node)
+        try:
+            node.run()
+        except Exception as e:
+            raise NodeException(e, node=node)
+        finally:
+            _running.node = None
+            _running.incremental = False
+            with _result_lock:
+                _active_nodes.discard(node)
+        if not node.has_run and node._result is not None:
+            warn(f"Node {node} at depth {node.depth} did not terminate correctly. The `_terminate()` method should be "
+                 f"called after node execution is complete. The node produced results, so the pipeline will continue "
+                 f"executing. Please contact the developers to fix the issue.")
+        elif node._result is None and not isinstance(node, OutputNode):
+            raise NodeException(ValueError(f"A node did not produce results. Pipeline halted."), node=node)
+        return
+
+    def release(self):
+        """Returns all of the pipeline's nodes to their pools for reuse; the pipeline should no longer be used."""
+        for node in self.pipeline.values():
+            node.release()
+        self.pipeline = {}
         return
 
     def reset(self):
-        for p in self.pipeline:
-            p.reset()
+        """Resets the nodes of the pipeline, in topological order, so that the pipeline can be run again."""
+        for node in self._topological_order():
+            node.reset()
         return
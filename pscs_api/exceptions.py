@@ -61,14 +61,40 @@ class NodeException(PipeLineException):
             Node instance that raised the error. Should have the .depth attribute set for additional info,
                  but isn't necessary.
         """
+        super().__init__(exception)
+        self._inner = exception
+        self._node = node
+        self._message = None  # set when the exception is rebuilt after pickling
+        return
+
+    def __reduce__(self):
+        # Nodes can't be pickled, so the exception is rebuilt from its message instead
+        return _node_exception_from_message, (type(self), str(self))
+
+    def __str__(self):
+        if self._message is not None:
+            return self._message
+        # The message is only built when needed, so that raising the exception doesn't require the node's depth.
         node_msg = ""
-        if node is not None:
-            node_msg = f" ({str(node)} at depth {node.depth})"
+        if self._node is not None:
+            try:
+                node_msg = f" ({str(self._node)} at depth {self._node.depth})"
+            except Exception:  # a problem with the node shouldn't hide the original exception
+                node_msg = f" ({str(self._node)})"
 
         err_msg = f"\n-----------------------------------\nAn exception occurred in a node{node_msg}:\n"
-        err_msg += f"{type(exception).__name__}: {str(exception)}"
-        super().__init__(err_msg)
-        return
+        err_msg += f"{type(self._inner).__name__}: {str(self._inner)}"
+        return err_msg
+
+
+def _node_exception_from_message(cls: type, message: str) -> NodeException:
+    """Recreates a pickled NodeException (or subclass) from its message."""
+    exception = cls.__new__(cls)
+    PipeLineException.__init__(exception, message)
+    exception._inner = None
+    exception._node = None
+    exception._message = message
+    return exception
 
 
 class ParameterInitializationError(Exception):
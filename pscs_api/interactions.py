@@ -1,36 +1,43 @@
 from __future__ import annotations
-from copy import deepcopy
+import re
+import sys
+from functools import lru_cache
 
 interaction_parameter_string = "param"
 interaction_fstring = interaction_parameter_string + "[{param}]"
 interaction_pattern = f"{interaction_parameter_string}\\[(.*?)\\]"
+interaction_regex = re.compile(interaction_pattern)
 
 
+def _frozen_names(names) -> frozenset:
+    """Freezes the names, interning strings so that set comparisons between interactions can match by identity."""
+    if names is None:
+        return frozenset()
+    return frozenset([sys.intern(n) if type(n) is str else n for n in names])
+
+
+@lru_cache(maxsize=1024)  # parameter names come from a small vocabulary
 def istr(arg):
     return interaction_fstring.format(param=arg)
 
 class InteractionList:
     def __init__(self, *args, **kwargs):
         self.interactions = [a for a in args]  # For adding defined Interactions
-        new_interaction = Interaction()  # for defining a simple interaction directly in the list
-        keep = False
-        for k, v in kwargs.items():
-            for vv in v:
-                getattr(new_interaction, k).add(vv)
-                keep = True
-        if keep:
+        # For defining a simple interaction directly in the list
+        new_interaction = Interaction(**kwargs)
+        if any(len(getattr(new_interaction, k)) > 0 for k in kwargs):
             self.interactions.append(new_interaction)
         return
 
     def __mul__(self, other):
         prod = InteractionList()
         if len(other) == 0:
-            return deepcopy(self)
+            return self.clone()
         if len(self) == 0:
-            return deepcopy(other)
+            return other.clone()
         for self_interaction in self.interactions:
             for other_interaction in other.interactions:
-                prod.interactions.append(self_interaction + other_interaction)
+                prod.interactions.append(Interaction._union_pair(self_interaction, other_interaction))
         return prod
 
     def product(self, other):
@@ -86,8 +93,13 @@ class InteractionList:
         return summed
 
     def __str__(self):
-        interactions = [str(i) for i in self.interactions]
-        return "\n".join(interactions)
+        return "\n".join(str(i) for i in self.interactions)
+
+    def clone(self) -> InteractionList:
+        """Copies the list and its interactions; much cheaper than deepcopy."""
+        cloned = type(self).__new__(type(self))
+        cloned.interactions = [interaction.clone() for interaction in self.interactions]
+        return cloned
 
     def as_list(self) -> list:
         """Produces a list of Interaction dicts"""
@@ -97,6 +109,9 @@ class InteractionList:
         return interaction_aslist
 
 class Interaction:
+    _SLOTS = ("obs", "var", "var_names", "obsm", "varm", "uns", "obsp", "layers")  # AnnData attributes that are tracked
+    __slots__ = _SLOTS
+
     def __init__(self,
                  obs: set = None,
                  var: set = None,
@@ -106,34 +121,32 @@ class Interaction:
                  uns: set = None,
                  obsp: set = None,
                  layers: set = None):
-        self.obs = set(obs) if obs is not None else set()
-        self.var = set(var) if var is not None else set()
-        self.var_names = set(var_names) if var_names is not None else set()
-        self.obsm = set(obsm) if obsm is not None else set()
-        self.varm = set(varm) if varm is not None else set()
-        self.uns = set(uns) if uns is not None else set()
-        self.obsp = set(obsp) if obsp is not None else set()
-        self.layers = set(layers) if layers is not None else set()
+        # Attributes are frozen so that they can be shared between copies; they are replaced rather than modified
+        self.obs = _frozen_names(obs)
+        self.var = _frozen_names(var)
+        self.var_names = _frozen_names(var_names)
+        self.obsm = _frozen_names(obsm)
+        self.varm = _frozen_names(varm)
+        self.uns = _frozen_names(uns)
+        self.obsp = _frozen_names(obsp)
+        self.layers = _frozen_names(layers)
         return
 
     def __gt__(self, other: Interaction):
         """Checks whether one interaction is a superset of the other. Useful for comparing against requirements."""
-        for var in vars(self):
-            if not getattr(self, var) > getattr(other, var):
-                return False
-        return True
+        return (self.obs > other.obs and self.var > other.var and self.var_names > other.var_names
+                and self.obsm > other.obsm and self.varm > other.varm and self.uns > other.uns
+                and self.obsp > other.obsp and self.layers > other.layers)
 
     def __eq__(self, other: Interaction):
-        for var in vars(self):
-            if not getattr(self, var) == getattr(other, var):
-                return False
-        return True
+        return (self.obs == other.obs and self.var == other.var and self.var_names == other.var_names
+                and self.obsm == other.obsm and self.varm == other.varm and self.uns == other.uns
+                and self.obsp == other.obsp and self.layers == other.layers)
 
     def __ge__(self, other: Interaction):
-        for var in vars(self):
-            if not getattr(self, var) >= getattr(other, var):
-                return False
-        return True
+        return (self.obs >= other.obs and self.var >= other.var and self.var_names >= other.var_names
+                and self.obsm >= other.obsm and self.varm >= other.varm and self.uns >= other.uns
+                and self.obsp >= other.obsp and self.layers >= other.layers)
 
     def __lt__(self, other: Interaction):
         return not (self > other or self == other)
@@ -142,10 +155,20 @@ class Interaction:
         return not (self > other)
 
     def __add__(self, other: Interaction):
-        summed = Interaction()
-        for var in vars(self):
-            getattr(summed, var).update(getattr(self, var))
-            getattr(summed, var).update(getattr(other, var))
+        return Interaction._union_pair(self, other)
+
+    @classmethod
+    def _union_pair(cls, first: Interaction, second: Interaction) -> Interaction:
+        """Creates the union of two interactions without first creating empty attributes."""
+        summed = cls.__new__(cls)
+        summed.obs = first.obs | second.obs
+        summed.var = first.var | second.var
+        summed.var_names = first.var_names | second.var_names
+        summed.obsm = first.obsm | second.obsm
+        summed.varm = first.varm | second.varm
+        summed.uns = first.uns | second.uns
+        summed.obsp = first.obsp | second.obsp
+        summed.layers = first.layers | second.layers
         return summed
 
     def __str__(self):
@@ -153,12 +176,31 @@ class Interaction:
 
     def add(self, other: Interaction):
         """Extends this object's attributes to include those in the argument."""
-        for var in vars(self):
-            getattr(self, var).update(getattr(other, var))
+        self.obs |= other.obs
+        self.var |= other.var
+        self.var_names |= other.var_names
+        self.obsm |= other.obsm
+        self.varm |= other.varm
+        self.uns |= other.uns
+        self.obsp |= other.obsp
+        self.layers |= other.layers
         return
 
+    def clone(self) -> Interaction:
+        """Copies the interaction. The attributes are frozensets, so the copy can share them."""
+        cloned = type(self).__new__(type(self))
+        cloned.obs = self.obs
+        cloned.var = self.var
+        cloned.var_names = self.var_names
+        cloned.obsm = self.obsm
+        cloned.varm = self.varm
+        cloned.uns = self.uns
+        cloned.obsp = self.obsp
+        cloned.layers = self.layers
+        return cloned
+
     def as_dict(self):
         out_dict = dict()
-        for v in vars(self):
-            out_dict[v] = sorted(getattr(self, v))
+        for name in Interaction._SLOTS:
+            out_dict[name] = sorted(getattr(self, name))
         return out_dict
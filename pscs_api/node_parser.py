@@ -5,17 +5,48 @@ import importlib.util
 from os.path import join, basename, dirname
 from pscs_api.base import InputNode, OutputNode, Pipeline, PipelineNode
 from pscs_api.exceptions import ParameterInitializationError
-from werkzeug.utils import secure_filename
 import os
 import json
+import math
+import re
 from importlib import import_module
 import inspect
-from typomancy.handlers import type_wrangler
 from argparse import ArgumentParser
 from typing import Collection
 import sys
+import weakref
 from pathlib import Path
 from collections import defaultdict as dd
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library json module is used without it
+    orjson = None
+
+_SIG_CACHE = weakref.WeakKeyDictionary()  # signatures of node classes and their __init__, keyed by the callable
+
+
+def _signature(obj: callable) -> inspect.Signature:
+    """
+    Returns the signature of the callable, computing it only once per callable.
+    Parameters
+    ----------
+    obj : callable
+        Callable whose signature should be returned.
+    Returns
+    -------
+    inspect.Signature
+        Signature of the callable.
+    """
+    try:
+        sig = _SIG_CACHE.get(obj)
+    except TypeError:  # can't be weakly referenced (e.g. builtins); don't cache
+        return inspect.signature(obj)
+    if sig is None:
+        sig = inspect.signature(obj)
+        _SIG_CACHE[obj] = sig
+    return sig
 
 
 def without_leading_underscore(d: dict) -> list:
@@ -50,13 +81,32 @@ def get_node_parameters(node: callable) -> dict:
     dict
         Dictionary containing the relevant parameters.
     """
+    return dict(_node_spec(node))  # copy; callers add their own entries
+
+
+def _node_spec(node: type) -> dict:
+    """
+    Returns the description of a node class used by get_node_parameters. The description only depends on the class,
+    so it is built on first use and stored on the class itself as __pscs_spec__.
+    Parameters
+    ----------
+    node : type
+        PipelineNode (or subclass) to describe.
+    Returns
+    -------
+    dict
+        Dictionary containing the relevant parameters. Shared; should not be modified.
+    """
+    spec = node.__dict__.get("__pscs_spec__")  # only the class's own; a subclass must not reuse its parent's
+    if spec is not None:
+        return spec
     d = dict()
-    param_dict = inspect.signature(node).parameters
-    params, req_params = parse_params(param_dict)
+    params, req_params = parse_params(_signature(node).parameters)
     # Check which type of node this is
-    if issubclass(node, InputNode):
+    role = getattr(node, "_pscs_role", None)
+    if role == "input":
         d["num_inputs"] = 0
-    elif issubclass(node, OutputNode):
+    elif role == "output":
         d["num_outputs"] = 0
         d["interactive_tag"] = node.interactive_tag
     # For whatever reason, user may want to overwrite the number of inputs.
@@ -67,6 +117,10 @@ def get_node_parameters(node: callable) -> dict:
     d["parameters"] = params
     d["important_parameters"] = node.important_parameters
     d["required_parameters"] = req_params
+    try:
+        node.__pscs_spec__ = d
+    except (AttributeError, TypeError):  # class doesn't accept new attributes; describe it again next time
+        pass
     return d
 
 
@@ -90,14 +144,14 @@ def parse_params(params_dict: dict) -> (dict, list):
         annot = str(param_value.annotation)
         # In case default value is empty, set to none
         default = param_value.default
-        if default == inspect._empty:
+        if default is inspect.Parameter.empty:
             default = None
             required_params.append(param_name)
         params.append({"name": param_name, "type": annot, "default": default})
     return params, required_params
 
 
-def find_unique_name(d: dict, name: str) -> str:
+def find_unique_name(d: dict, name: str, counts: dict = None) -> str:
     """
     Creates a string from "name" that is not present in "d" by appending "_X".
     Parameters
@@ -106,18 +160,25 @@ def find_unique_name(d: dict, name: str) -> str:
         Dictionary into which "name" is trying to fit uniquely.
     name : str
         Base name
+    counts : dict
+        Optional dict tracking the next suffix to try for each base name. When the same dict is passed to repeated
+        calls, earlier suffixes aren't probed again. Updated in place.
 
     Returns
     -------
     str
         New name that is not in d
     """
-    dkeys = d.keys()
-    id = -1
-    newname = name
-    while newname in dkeys:
+    if counts is None:
+        id = -1
+    else:
+        id = counts.get(name, -1)  # -1 is the bare name
+    newname = name if id == -1 else f"{name}_{id}"
+    while newname in d:
         id += 1
         newname = f"{name}_{id}"
+    if counts is not None:
+        counts[name] = id + 1
     return newname
 
 
@@ -134,48 +195,102 @@ def load_from_nodes(node_json: str) -> Pipeline:
     Pipeline
     """
     # Load data
-    f = open(node_json, 'r')
-    pipeline = json.load(f)
-    node_data = pipeline['nodes']
-    f.close()
-    node_dict = {}
-    src_dict = {}
-    dst_dict = {}
-    for node in node_data:
-        node_module = node['module']
-        if node_module.endswith(".py"):
-            node_module = node_module[:-3]
-        node_name = node['procName']
-        # Restrict imports to PSCS pipeline:
-        module = import_module(f'{node_module}', package=__package__)
-        node_class = inspect.getmembers(module, lambda mem: inspect.isclass(mem) and mem.__name__ == node_name)[0][1]
-
-        # Instantiate the class with specified parameters
-        # Get class annotations and convert JSON values to the type specified
-        class_params = inspect.signature(node_class.__init__).parameters
+    with open(node_json, 'rb') as f:
+        node_bytes = f.read()
+    if orjson is not None:
+        try:
+            pipeline = orjson.loads(node_bytes)
+        except orjson.JSONDecodeError:  # orjson rejects NaN and Infinity, which json accepts
+            pipeline = json.loads(node_bytes)
+    else:
+        pipeline = json.loads(node_bytes)
+    entries = [_load_node(node) for node in pipeline['nodes']]
+    node_dict = {node_num: node_instance for node_num, node_instance, _ in entries}
+    src_dict = {node_num: node_srcs for node_num, _, node_srcs in entries}
+    connect_nodes(node_dict, src_dict)
+    return node_dict
+
+
+_BINDER_CACHE = weakref.WeakKeyDictionary()  # parameter binders of node classes, keyed by the class
+
+
+def _param_binder(node_class: type) -> callable:
+    """
+    Creates a function that converts the parameter values of an exported node to the types annotated in the
+    node class's __init__. The function is only created once per class.
+    Parameters
+    ----------
+    node_class : type
+        PipelineNode (or subclass) whose parameters should be bound.
+    Returns
+    -------
+    callable
+        Function taking the exported node dict and returning the keyword arguments for node_class.
+    """
+    bind = _BINDER_CACHE.get(node_class)
+    if bind is not None:
+        return bind
+    from typomancy.handlers import type_wrangler  # only needed when loading pipelines; not imported with the module
+    # Get class annotations and defaults once; the JSON values are converted to the type specified
+    class_params = [(param_name, param_obj.annotation, param_obj.default)
+                    for param_name, param_obj in _signature(node_class.__init__).parameters.items()
+                    if param_name != "self"]
+
+    def bind(node: dict) -> dict:
         cast_params = dict()
-        for param_name, param_obj in class_params.items():
-            if param_name == "self":
-                continue
+        for param_name, annotation, default in class_params:
             try:
-                par = type_wrangler(node["paramsValues"][param_name], param_obj.annotation)
+                par = type_wrangler(node["paramsValues"][param_name], annotation)
             except Exception as e:
                 raise ParameterInitializationError(msg = None,
                                                    parameter_name=param_name,
-                                                   casting_type=param_obj.annotation,
+                                                   casting_type=annotation,
                                                    exception=e,
                                                    node=node)
             if par is None:
-                par = param_obj.default
+                par = default
             cast_params[param_name] = par
-        node_instance = node_class(**cast_params)
-        node_instance.nodeId = node['nodeId']
-        node_num, node_srcs, node_dsts = identify_connections(node)
-        node_dict[node_num] = node_instance
-        src_dict[node_num] = node_srcs
-        dst_dict[node_num] = node_dsts
-    connect_nodes(node_dict, src_dict)
-    return node_dict
+        return cast_params
+    _BINDER_CACHE[node_class] = bind
+    return bind
+
+
+def _load_node(node: dict) -> (str, PipelineNode, list):
+    """
+    Instantiates a single node exported from the pipeline designer.
+    Parameters
+    ----------
+    node : dict
+        Dictionary describing a single node, its parameters and its connections.
+    Returns
+    -------
+    str
+        Node ID
+    PipelineNode
+        Instance of the node's class, initialized with the node's parameters.
+    list
+        List of node IDs that have this node as their source.
+    """
+    node_module = node['module']
+    if node_module.endswith(".py"):
+        node_module = node_module[:-3]
+    node_name = node['procName']
+    # Restrict imports to PSCS pipeline:
+    module = import_module(f'{node_module}', package=__package__)
+    node_class = inspect.getattr_static(module, node_name, None)  # the class is normally bound under its own name
+    if not (inspect.isclass(node_class) and node_class.__name__ == node_name):
+        node_classes = inspect.getmembers_static(module,
+                                                 lambda mem: inspect.isclass(mem) and mem.__name__ == node_name)
+        if len(node_classes) == 0:
+            raise ValueError(f"Module {node_module} has no node class named {node_name}.")
+        node_class = node_classes[0][1]
+
+    # Instantiate the class with specified parameters
+    cast_params = _param_binder(node_class)(node)
+    node_instance = node_class(**cast_params)
+    node_instance.nodeId = node['nodeId']
+    node_num, node_srcs, _ = identify_connections(node)
+    return node_num, node_instance, node_srcs
 
 
 def initialize_pipeline(node_json: str, input_files: dict, output_dir: str):
@@ -214,16 +329,46 @@ def assign_outputs(pipeline: Pipeline, output_dir: str) -> None:
     -------
     None
     """
-    for node_num, node in pipeline.pipeline.items():
+    for node in pipeline.pipeline.values():
         if isinstance(node, OutputNode):
-            save_name = node.parameters["save"]
-            num_leading_uscore = len(save_name) - len(save_name.lstrip("_"))  # secure_filename has a hangup on uscores
+            save_name = _secure_save_name(node.parameters["save"])
             if node.interactive_tag == "":
-                node.parameters["save"] = join(output_dir, "_"*num_leading_uscore + secure_filename(node.parameters["save"]))
+                node.parameters["save"] = join(output_dir, save_name)
             else:
-                node.parameters["save"] = join(output_dir, secure_filename(node.interactive_tag), "_"*num_leading_uscore + secure_filename(node.parameters["save"]))
+                node.parameters["save"] = join(output_dir, _secure_filename(node.interactive_tag), save_name)
     return
 
+
+_SAFE_FILENAME_RE = re.compile(r"[A-Za-z0-9_.\-]+")  # characters that secure_filename leaves alone
+
+
+@lru_cache(maxsize=1024)
+def _secure_filename(filename: str) -> str:
+    """Memoized secure_filename; output nodes frequently share names and tags."""
+    if (os.name != "nt" and _SAFE_FILENAME_RE.fullmatch(filename) is not None
+            and filename[0] not in "._" and filename[-1] not in "._"):
+        return filename  # secure_filename would return it unchanged
+    from werkzeug.utils import secure_filename  # only needed when assigning outputs; not imported with the module
+    return secure_filename(filename)
+
+
+@lru_cache(maxsize=1024)
+def _secure_save_name(save_name: str) -> str:
+    """
+    Secures the save name of an output node, keeping its leading underscores.
+    Parameters
+    ----------
+    save_name : str
+        Save name to secure.
+    Returns
+    -------
+    str
+        Secured save name.
+    """
+    num_leading_uscore = len(save_name) - len(save_name.lstrip("_"))  # secure_filename has a hangup on uscores
+    return "_"*num_leading_uscore + _secure_filename(save_name[num_leading_uscore:])
+
+
 def assign_inputs(pipeline: Pipeline, input_files: dict, path_keyword: str = 'path') -> None:
     """
     Assigns the input files
@@ -240,10 +385,11 @@ def assign_inputs(pipeline: Pipeline, input_files: dict, path_keyword: str = 'pa
     -------
     None
     """
-    input_keys = input_files.keys()
-    for node_num, node in pipeline.pipeline.items():
-        if node.nodeId in input_keys:
-            node.parameters[path_keyword] = input_files[node.nodeId]
+    missing = object()  # input_files may legitimately map a node to None
+    for node in pipeline.pipeline.values():
+        input_file = input_files.get(node.nodeId, missing)
+        if input_file is not missing:
+            node.parameters[path_keyword] = input_file
     return
 
 
@@ -261,13 +407,34 @@ def connect_nodes(node_dict: dict, src_dict: dict) -> None:
     -------
     None
     """
-    for key_node, node in node_dict.items():
-        for srcnode in src_dict[key_node]:
-            srcnode = srcnode.split(".")[0] + ".0"
-            node.connect_to_output(node_dict[srcnode])
+    get_node = node_dict.__getitem__
+    Pipeline.bulk_connect([(node, get_node(srcnode.split(".")[0] + ".0"))
+                           for key_node, node in node_dict.items()
+                           for srcnode in src_dict[key_node]])
     return
 
 
+def _connector_fields(connector: str) -> (str, str):
+    """
+    Returns the second and third fields of a connector string, whose fields are separated by "-".
+    Parameters
+    ----------
+    connector : str
+        Connector string, as exported from the pipeline designer.
+    Returns
+    -------
+    str
+        Second field of the connector.
+    str
+        Third field of the connector.
+    """
+    _, _, rest = connector.partition('-')
+    second, sep, rest = rest.partition('-')
+    if sep == "":
+        raise ValueError(f"Malformed connector: {connector}")
+    return second, rest.partition('-')[0]
+
+
 def identify_connections(node: dict) -> (str, list, list):
     """
     Identifies the node's ID and input & output connections.
@@ -289,18 +456,23 @@ def identify_connections(node: dict) -> (str, list, list):
     node_id_dst = -1
     srcs = []
     dsts = []
+    # Only the second and third fields of a connector are used; the node ID is taken from the last connector
+    fields = None
     for s in node["srcConnectors"]:
-        ssplit = s.split('-')
-        srcs.append(ssplit[2])
-        node_id_src = ssplit[1].split(".")[0]  + ".0"  # patch; node id should not have port info
+        fields = _connector_fields(s)
+        srcs.append(fields[1])
+    if fields is not None:
+        node_id_src = fields[0].partition(".")[0] + ".0"  # patch; node id should not have port info
+    fields = None
     for d in node['dstConnectors']:
-        dsplit = d.split('-')
-        dsts.append(dsplit[1])
-        node_id_dst = dsplit[2].split(".")[0]  + ".0"  # patch; node id should not have port info
+        fields = _connector_fields(d)
+        dsts.append(fields[0])
+    if fields is not None:
+        node_id_dst = fields[1].partition(".")[0] + ".0"  # patch; node id should not have port info
     if node_id_dst != -1:
-        node_id = node_id_dst.split(".")[0] + ".0"  # patch; node id should not have port info
+        node_id = node_id_dst
     elif node_id_src != -1:
-        node_id = node_id_src.split(".")[0] + ".0"  # patch; node id should not have port info
+        node_id = node_id_src
     else:
         raise ValueError('Could not determine ID for node.')
     return node_id, srcs, dsts
@@ -309,39 +481,63 @@ def identify_connections(node: dict) -> (str, list, list):
 def parse_package(out_path: Path,
                   parse_directory: str = None,
                   package_name: str = None,
-                  display_name: str = None):
-    all_files = []
+                  display_name: str = None,
+                  max_workers: int = 1,
+                  use_threads: bool = False):
+    """
+    Parses the node definitions found in the .py files of a directory and writes their description to a JSON file.
+    Parameters
+    ----------
+    out_path : Path
+        Path where the JSON description should be written.
+    parse_directory : str
+        Directory containing the .py files to parse.
+    package_name : str
+        Name of the package; used as the top-level module.
+    display_name : str
+        Name of the package to display.
+    max_workers : int
+        Maximum number of files to import concurrently; None uses os.cpu_count(). Unless use_threads is set, the
+        files are imported in worker processes, so scripts that use the "spawn" start method (the default on macOS and
+        Windows) must call this from under an `if __name__ == "__main__":` guard. Default: 1.
+    use_threads : bool
+        Whether to import the files in threads of this process instead of in worker processes. Threads only overlap
+        the I/O of the imports, but avoid starting processes. Default: False.
+    Returns
+    -------
+    ModuleNest
+        Nested module structure of the package.
+    """
     offset = 0
     if not parse_directory.endswith(os.path.sep):
         offset = 1  # in case the parse_directory is "path/" instead of "path"
     # Walk through specified directory, find .py files that aren't __init__.py
-    for dirpath, _, files in os.walk(parse_directory):
-        for file in files:
-            if file.endswith(".py") and file != "__init__.py":
-                f_path = os.path.join(dirpath, file)
-                all_files.append(f_path)
+    all_files = list(iter_py_files(parse_directory, exclude_files={"__init__.py"}))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    file_args = (all_files,
+                 [package_name]*len(all_files),
+                 [parse_directory]*len(all_files),
+                 [offset]*len(all_files))
+    if max_workers > 1 and len(all_files) > 1 and use_threads:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(all_files))) as executor:
+            file_nodes = list(executor.map(_introspect_file, *file_args))
+    elif max_workers > 1 and len(all_files) > 1:
+        # Each file is imported in a worker process; imports are often the slow part and don't share state.
+        max_workers = min(max_workers, len(all_files))
+        chunksize = max(1, len(all_files) // (4*max_workers))  # batch files to cut down on round-trips to workers
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            file_nodes = list(executor.map(_introspect_file, *file_args, chunksize=chunksize))
+    else:
+        file_nodes = list(map(_introspect_file, *file_args))
 
     nodes = []
     module_set = set()  # We can ignore duplicates; that just means that there are multiple nodes in a file.
-    for i in range(len(all_files)):
-        start_modules = sys.modules  # To later undo included modules
-        spec = importlib.util.spec_from_file_location(package_name, all_files[i])  # get spec for import
-        module = importlib.util.module_from_spec(spec)  # define module
-        sys.modules[all_files[i]] = module  # add module
-        spec.loader.exec_module(module)  # load module
-        # Find the class definitions in the file
-        node_classes = inspect.getmembers(module, lambda mem: inspect.isclass(mem) and mem.__module__ == package_name)
-        for n in node_classes:
-            # importing modules uses a string of form top.second.third.[...]; also doesn't end in .py
-            m = convert_path_to_modules(all_files[i][len(parse_directory) + offset:])
-            module_path = ".".join([package_name, m])  # include top-level path
-            module_set.add(module_path)  # track module
-            node_params = get_node_parameters(n[1])  # from the class definition
-            node_params["type"] = get_node_type(n[1])
-            node_params["module"] = module_path  # add module info
-            node_params["name"] = n[0]
+    for f_nodes in file_nodes:
+        for node_params in f_nodes:
+            module_set.add(node_params["module"])  # track module
             nodes.append(node_params)
-        sys.modules = start_modules  # Undoing included modules
 
     module_list = list(module_set)
     module_list.sort()  # for reproducibility
@@ -363,17 +559,95 @@ def parse_package(out_path: Path,
     package_dict = {}
     package_dict["display_name"] = display_name
     package_dict["modules"] = base_module.to_dict()
-    f = open(out_path, "w")
-    json.dump(package_dict, f, indent=1)
-    f.close()
+    _write_json(package_dict, out_path)
     return base_module
 
 
+def _write_json(obj, out_path: Path) -> None:
+    """
+    Writes obj to out_path as JSON. orjson is used when it is available and can represent obj exactly; otherwise the
+    standard library json module is used.
+    Parameters
+    ----------
+    obj
+        Object to write.
+    out_path : Path
+        Path to the output file.
+    Returns
+    -------
+    None
+    """
+    if orjson is not None and not _has_non_finite(obj):  # orjson would write NaN and Infinity as null
+        try:
+            obj_bytes = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # e.g. integers beyond 64 bits
+            obj_bytes = None
+        if obj_bytes is not None:
+            with open(out_path, "wb") as f:  # orjson produces UTF-8 bytes; no need to decode them first
+                f.write(obj_bytes)
+            return
+    with open(out_path, "w") as f:
+        json.dump(obj, f, indent=1)
+    return
+
+
+def _has_non_finite(obj) -> bool:
+    """Checks whether obj contains a float that is NaN or infinite."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(k) or _has_non_finite(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    return False
+
+
+def _introspect_file(f_path: str,
+                     package_name: str,
+                     parse_directory: str,
+                     offset: int) -> list:
+    """
+    Imports a file and describes the node classes that it defines.
+    Parameters
+    ----------
+    f_path : str
+        Path to the .py file to import.
+    package_name : str
+        Name of the package being parsed; classes defined in the file have it as their module.
+    parse_directory : str
+        Directory being parsed; used to determine the module path of the file.
+    offset : int
+        Number of path separators between parse_directory and the relative path of the file.
+    Returns
+    -------
+    list
+        List of node parameter dicts, as produced by get_node_parameters, with the node's type, module and name.
+    """
+    spec = importlib.util.spec_from_file_location(package_name, f_path)  # get spec for import
+    module = importlib.util.module_from_spec(spec)  # define module
+    sys.modules[f_path] = module  # add module
+    spec.loader.exec_module(module)  # load module
+    # Find the class definitions in the file
+    # Read the module namespace directly; getmembers would getattr every name. Sorted by name as getmembers is.
+    node_classes = sorted(((name, mem) for name, mem in vars(module).items()
+                           if inspect.isclass(mem) and mem.__module__ == package_name), key=lambda n: n[0])
+    # importing modules uses a string of form top.second.third.[...]; also doesn't end in .py
+    m = convert_path_to_modules(f_path[len(parse_directory) + offset:])
+    module_path = ".".join([package_name, m])  # include top-level path
+    nodes = []
+    for n in node_classes:
+        node_params = get_node_parameters(n[1])  # from the class definition
+        node_params["type"] = get_node_type(n[1])
+        node_params["module"] = module_path  # add module info
+        node_params["name"] = n[0]
+        nodes.append(node_params)
+    return nodes
+
+
 def get_node_type(node_class):
-    if issubclass(node_class, InputNode):
-        return "input"
-    elif issubclass(node_class, OutputNode):
-        return "output"
+    role = getattr(node_class, "_pscs_role", None)  # "input" or "output" for subclasses of the I/O prototypes
+    if role is not None:
+        return role
     elif issubclass(node_class, PipelineNode):
         return "simo"
 
@@ -403,6 +677,9 @@ class ModuleNest:
             self.children = children
         else:
             self.children = []
+        self._child_index = {}  # child name -> child module; the first child with a given name wins
+        for c in reversed(self.children):
+            self._child_index[c.name] = c
 
         if nodes is not None:
             self.nodes = nodes
@@ -423,10 +700,11 @@ class ModuleNest:
             Whether the child was added. If False, the child module was not added since an identically-named child
             is already there.
         """
-        if self[child.name] is None:  # child doesn't appear in the list; should be added
-            self.children.append(child)
-            return True
-        return False
+        if child.name in self._child_index:
+            return False
+        self.children.append(child)
+        self._child_index[child.name] = child
+        return True
 
     def add_node(self,
                  module_str: str,
@@ -448,18 +726,17 @@ class ModuleNest:
         -------
         None
         """
-        if "." not in module_str:  # at the bottom of the module_str
-            if node not in self.nodes:
-                self[module_str].nodes.append(node)
-        else:
-            split = module_str.split(".")
-            if first_call:
-                split = split[1:]  # remove top-level package
-            new_module_str = ".".join(split[1:])
+        split = module_str.split(".")
+        if first_call and len(split) > 1:
+            split = split[1:]  # remove top-level package
             if len(split) == 1:
                 self[split[0]].nodes.append(node)
                 return
-            self[split[0]].add_node(new_module_str, node, first_call=False)  # select child, go down one level
+        parent = self
+        for s in split[:-1]:  # select child, go down one level
+            parent = parent[s]
+        if node not in parent.nodes:
+            parent[split[-1]].nodes.append(node)
         return
 
     def get_node(self, module_str: str, first_call: bool = True) -> dict:
@@ -481,18 +758,21 @@ class ModuleNest:
         """Creates a string summarizing the nested structure of the modules. Modules containing other modules are
          indicated with an arrow (→), nodes are indicated with a bullet point (•)."""
         spacing = "  "
-        tabs = spacing*depth
-        node_str = ""
-        if show_nodes:
-            for n in self.nodes:
-                node_str += f"\n{tabs}{spacing}•{n['name']}"
-        if self.children is not None:
-            if len(self.children) >= 1:
-                return f"{tabs}{self.name} → {node_str}{self.summarize_list(self.children, depth=depth+1, show_nodes=show_nodes)}"
-            else:
-                return f"{tabs}{self.name}{node_str}"
-        else:
-            return f"{tabs}{self.name}{node_str}"
+        parts = []
+        stack = [(self, depth)]  # modules still to be summarized; popped in print order
+        while len(stack) > 0:
+            module, module_depth = stack.pop()
+            tabs = spacing*module_depth
+            if len(parts) > 0:
+                parts.append("\n")
+            parts.append(f"{tabs}{module.name}")
+            if module.children is not None and len(module.children) >= 1:
+                parts.append(" → ")
+                stack.extend((c, module_depth+1) for c in reversed(module.children))
+            if show_nodes:
+                for n in module.nodes:
+                    parts.append(f"\n{tabs}{spacing}•{n['name']}")
+        return "".join(parts)
 
     @staticmethod
     def summarize_list(lst: list[ModuleNest], depth=0, show_nodes=True):
@@ -507,14 +787,19 @@ class ModuleNest:
         return self.name
 
     def __getitem__(self, key):  # allows to get child modules via n[child]
-        for c in self.children:
-            if c.name == key:
-                return c
-        return None
+        return self._child_index.get(key)
 
     def to_dict(self):
         """Converts the nested structure to a single dictionary."""
-        return {"name": self.name, "modules": [c.to_dict() for c in self.children], "nodes": self.nodes}
+        module_dict = {"name": self.name, "modules": [], "nodes": self.nodes}
+        stack = [(self, module_dict)]
+        while len(stack) > 0:
+            module, d = stack.pop()
+            for c in module.children:
+                child_dict = {"name": c.name, "modules": [], "nodes": c.nodes}
+                d["modules"].append(child_dict)
+                stack.append((c, child_dict))
+        return module_dict
 
 
 def convert_pathlist_to_modules(pathlist: list) -> list:
@@ -533,18 +818,48 @@ def convert_path_to_modules(path: str) -> str:
 
 
 
+def iter_py_files(directory: str, exclude_files: Collection[str] = ()):
+    """
+    Yields the paths of the .py files in a directory and its subdirectories, in the same order as os.walk would
+    produce them. The file type of each entry is taken from os.scandir, so files are not stat'ed a second time.
+    Parameters
+    ----------
+    directory : str
+        Directory to search.
+    exclude_files : Collection[str]
+        File names (not paths) to skip.
+    Returns
+    -------
+    Generator[str]
+        Paths of the .py files.
+    """
+    pending = [directory]
+    while len(pending) > 0:
+        current = pending.pop()
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():  # like os.walk, don't follow links to directories
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.name not in exclude_files:
+                        files.append(entry.path)
+        except OSError:  # like os.walk, skip directories that can't be read
+            continue
+        yield from files
+        pending.extend(reversed(subdirs))
+    return
+
+
 def gather_files(parse_directory: str = None,
                  exclude_files: list = None):
     """Gathers all files in a directory that aren't explicitly marked for exclusion"""
     if exclude_files is None:
         exclude_files = []
     exclude_files = set(exclude_files)
-    all_files = set()
-    for dirname, _, filenames in os.walk(parse_directory):
-        for f in filenames:
-            if f.endswith(".py") and f not in exclude_files:
-                all_files.add(os.path.join(dirname, f))
-    return all_files
+    return set(iter_py_files(parse_directory, exclude_files=exclude_files))
 
 
 def remove_excluded_files(files: Collection[str],
@@ -559,11 +874,7 @@ def remove_excluded_files(files: Collection[str],
 
 def remove_notpy(files: Collection[str]) -> list:
     """Removes entries in file_list that don't end in .py"""
-    exclude_files = set()
-    for f in files:
-        if not f.endswith(".py"):
-            exclude_files.add(f)
-    return remove_excluded_files(files, exclude_files)
+    return list({f for f in files if f.endswith(".py")})
 
 
 def determine_name(package_name: str = None,
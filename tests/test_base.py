@@ -2,7 +2,10 @@ import unittest
 from typing import Optional, Collection
 import io
 import contextlib
-from pscs_api.base import Pipeline, PipelineNode, InputNode, OutputNode
+import pickle
+from unittest import mock
+from pscs_api import base
+from pscs_api.base import Pipeline, PipelineNode, InputNode, OutputNode, InteractionList
 from pscs_api.exceptions import NodeException
 
 
@@ -19,7 +22,9 @@ class TestBase(unittest.TestCase):
         inp = SampleInput()
         pnode = SampleNodeTriple()
         inp.connect_to_output(pnode)
+        self.assertFalse(pnode.is_ready)
         inp.run()
+        self.assertTrue(pnode.is_ready)
         pnode.run()
         self.assertEqual(pnode.result, [3, 6, 9])
         return
@@ -53,6 +58,126 @@ class TestBase(unittest.TestCase):
         self.assertTrue("[3, 6, 9]" in out_str.getvalue())
         return
 
+    def test_pipeline_pickle(self):
+        inp = SampleInput()
+        pnode = SampleNodeTriple()
+        inp.connect_to_output(pnode)
+        pipeline = Pipeline(nodes={0: inp, 1: pnode})
+        pipeline.run()
+        self.assertEqual(pnode.depth, 1)
+        unpickled = pickle.loads(pickle.dumps(pipeline))
+        self.assertEqual(unpickled.pipeline[1].result, [3, 6, 9])
+        self.assertEqual(unpickled.pipeline[1].depth, 1)
+        self.assertIs(unpickled.pipeline[1]._previous[0], unpickled.pipeline[0])
+        return
+
+    def test_connect_to_input(self):
+        inp = SampleInput()
+        pnode = SampleNodeTriple()
+        outp = SampleOutput()
+        pnode.connect_to_input(inp)
+        outp.connect_to_input(pnode)
+        self.assertEqual(inp._next, [pnode])
+        self.assertEqual(outp._previous, [pnode])
+        pipeline = Pipeline(nodes={0: inp, 1: pnode, 2: outp})
+        out_str = io.StringIO()
+        with contextlib.redirect_stdout(out_str):
+            pipeline.run()
+        self.assertTrue("[3, 6, 9]" in out_str.getvalue())
+        return
+
+    def test_bulk_connect(self):
+        inp = SampleInput()
+        pnode = SampleNodeTriple()
+        outp = SampleOutput()
+        inp.connect_to_output(pnode)
+        Pipeline.bulk_connect([(pnode, outp)])
+        self.assertEqual(inp._next, [pnode])
+        self.assertEqual(pnode._next, [outp])
+        self.assertEqual(outp._previous, [pnode])
+        with self.assertRaises(ValueError):
+            Pipeline.bulk_connect([(outp, inp)])  # output nodes can't be connected downstream
+        pipeline = Pipeline(nodes={0: inp, 1: pnode, 2: outp})
+        out_str = io.StringIO()
+        with contextlib.redirect_stdout(out_str):
+            pipeline.run()
+        self.assertTrue("[3, 6, 9]" in out_str.getvalue())
+        return
+
+    def test_repeated_connection(self):
+        # A node can take the same output on several of its inputs
+        for connect in [lambda src, dst: src.connect_to_output(dst),
+                        lambda src, dst: dst.connect_to_input(src),
+                        lambda src, dst: Pipeline.bulk_connect([(src, dst)])]:
+            inp = SampleInput()
+            pair = SamplePairNode()
+            connect(inp, pair)
+            connect(inp, pair)
+            self.assertEqual(pair._previous, [inp, inp])
+            Pipeline(nodes={0: inp, 1: pair}).run()
+            self.assertEqual(pair.result, [[1, 2, 3, 0], [1, 2, 3]])
+        return
+
+    def test_partial_pipeline(self):
+        # Predecessors outside of the pipeline are used if they have already run
+        for parallel in [True, False]:
+            inp = SampleInput()
+            first = SampleNodeTriple()
+            second = SampleNodeTriple()
+            inp.connect_to_output(first)
+            first.connect_to_output(second)
+            inp.run()
+            Pipeline(nodes={1: first, 2: second}).run(parallel=parallel)
+            self.assertEqual(first.result, [3, 6, 9])
+            self.assertEqual(second.result, [9, 18, 27])
+        # ...and the pipeline can't run if they haven't
+        inp = SampleInput()
+        first = SampleNodeTriple()
+        inp.connect_to_output(first)
+        self.assertRaises(NodeException, Pipeline(nodes={1: first}).run)
+        return
+
+    def test_pipeline_cycle(self):
+        inp = SampleInput()
+        first = SampleNodeTriple()
+        second = SampleNodeTriple()
+        inp.connect_to_output(first)
+        first.connect_to_output(second)
+        second.connect_to_output(first)
+        pipeline = Pipeline(nodes={0: inp, 1: first, 2: second})
+        self.assertRaises(NodeException, pipeline.run)
+        self.assertRaises(NodeException, pipeline.run, parallel=False)
+        self.assertRaises(NodeException, pipeline.reset)
+        return
+
+    def test_pipeline_reset(self):
+        inp = SampleInput()
+        pnode = SampleNodeTriple()
+        inp.connect_to_output(pnode)
+        pipeline = Pipeline(nodes={0: inp, 1: pnode})
+        pipeline.run()
+        pipeline.reset()
+        self.assertIsNone(pnode.result)
+        pipeline.run()
+        self.assertEqual(pnode.result, [3, 6, 9])
+        return
+
+    def test_pipeline_add_node(self):
+        # Nodes added to the pipeline after it has run are included in later runs and validation
+        inp = SampleInput()
+        pnode = SampleNodeTriple()
+        req = SampleRequirementNode()
+        inp.connect_to_output(pnode)
+        pnode.connect_to_output(req)
+        pipeline = Pipeline(nodes={0: inp, 1: pnode})
+        pipeline.validate()
+        pipeline.run(parallel=False)
+        pipeline.pipeline[2] = req
+        self.assertRaises(NodeException, pipeline.validate)
+        pipeline.run(parallel=False)
+        self.assertEqual(req.result, [3, 6, 9])
+        return
+
     def test_exception_node(self):
         inp = SampleInput()
         pnode = SampleNodeTriple()
@@ -82,6 +207,177 @@ class TestBase(unittest.TestCase):
             self.assertRaises(NodeException, pipeline.run)
         return
 
+    def test_exception_pickle(self):
+        inp = SampleInput()
+        exc = ExceptionNode("test")
+        inp.connect_to_output(exc)
+        pipeline = Pipeline(nodes={0: inp, 1: exc})
+        with self.assertRaises(NodeException) as context:
+            pipeline.run()
+        unpickled = pickle.loads(pickle.dumps(context.exception))
+        self.assertIsInstance(unpickled, NodeException)
+        self.assertEqual(str(unpickled), str(context.exception))
+        return
+
+    def test_cumulative_effect(self):
+        inp = SampleInput()
+        left = SampleEffectNode()
+        right = SampleEffectNode()
+        merge = SampleEffectNode()
+        inp.connect_to_output(left)
+        inp.connect_to_output(right)
+        left.connect_to_output(merge)
+        right.connect_to_output(merge)
+        self.assertTrue(merge.cumulative_effect >= InteractionList(obs=["effect"]))
+        self.assertIs(merge.cumulative_effect, merge.cumulative_effect)  # cached
+        # Changing the connections invalidates the cached value
+        cached = merge.cumulative_effect
+        merge.connect_to_output(SampleEffectNode())
+        self.assertIsNot(cached, merge.cumulative_effect)
+        # Changes made while the value is being computed also invalidate it
+        unique_interactions = base._unique_interactions
+
+        def bump_and_dedupe(interactions):
+            base._bump_graph_version()
+            return unique_interactions(interactions)
+        merge.reset()
+        with mock.patch("pscs_api.base._unique_interactions", side_effect=bump_and_dedupe):
+            cached = merge.cumulative_effect
+        self.assertIsNot(cached, merge.cumulative_effect)
+        return
+
+    def test_cumulative_effect_diamonds(self):
+        # Each diamond doubles the number of paths; identical paths must not multiply the alternatives
+        inp = SampleInput()
+        nodes = {0: inp}
+        last = inp
+        for _ in range(32):
+            left = SampleEffectNode()
+            right = SampleEffectNode()
+            merge = SampleRequirementNode()
+            last.connect_to_output(left)
+            last.connect_to_output(right)
+            left.connect_to_output(merge)
+            right.connect_to_output(merge)
+            for node in (left, right, merge):
+                nodes[len(nodes)] = node
+            last = merge
+        self.assertEqual(len(last.cumulative_effect), 1)
+        self.assertEqual(len(last.cumulative_requirements), 1)
+        Pipeline(nodes=nodes).validate()
+        return
+
+    def test_resolve_interactions(self):
+        # Values that compare equal but are written differently must resolve to different names
+        for value, expected in [(1, "col_1"), (1.0, "col_1.0"), (True, "col_True"),
+                                ([1, 2], "col_2"), ([1.0, 2], "col_1.0")]:
+            node = SampleParameterEffectNode()
+            node.parameters["arg"] = value
+            node.resolve_interactions()
+            self.assertIn(expected, node.effects.as_list()[0]["obs"])
+        return
+
+    def test_slotted_subclass(self):
+        # Subclasses may declare __slots__, with or without their own effects
+        for node_class in [SampleSlottedNode, SampleSlottedEffectNode]:
+            inp = SampleInput()
+            node = node_class()
+            inp.connect_to_output(node)
+            Pipeline(nodes={0: inp, 1: node}).run()
+            self.assertEqual(node.result, [1, 2, 3])
+        self.assertTrue(SampleSlottedEffectNode().effects >= InteractionList(obs=["effect"]))
+        return
+
+    def test_validate(self):
+        inp = SampleInput()
+        effect = SampleEffectNode()
+        req = SampleRequirementNode()
+        inp.connect_to_output(effect)
+        effect.connect_to_output(req)
+        Pipeline(nodes={0: inp, 1: effect, 2: req}).validate()
+        # Without the preceding effect, the requirement is unmet
+        inp = SampleInput()
+        req = SampleRequirementNode()
+        inp.connect_to_output(req)
+        self.assertRaises(NodeException, Pipeline(nodes={0: inp, 1: req}).validate)
+        return
+
+    def test_fanout_results(self):
+        inp = SampleInput()
+        branches = [SampleAppendNode() for _ in range(3)]
+        for branch in branches:
+            inp.connect_to_output(branch)
+        Pipeline(nodes={i: n for i, n in enumerate([inp] + branches)}).run()
+        # Each branch modified its input in place; they should not see each other's changes
+        for branch in branches:
+            self.assertEqual(branch.result, [1, 2, 3, 4])
+        return
+
+    def test_threaded_fanout_results(self):
+        # Branches run concurrently and overwrite their input in place while the other branch may still be copying it
+        for _ in range(3):
+            inp = SampleRangeInput()
+            branches = [SampleOverwriteNode() for _ in range(2)]
+            for branch in branches:
+                inp.connect_to_output(branch)
+            with mock.patch("pscs_api.base.os.cpu_count", return_value=4):
+                Pipeline(nodes={i: n for i, n in enumerate([inp] + branches)}).run()
+            for branch in branches:
+                self.assertEqual(branch.overwritten_seen, 0)
+        return
+
+    def test_incremental_run(self):
+        inp = SampleInput()
+        changed = SampleNodeTriple()
+        unchanged = SampleNodeTriple()
+        inp.connect_to_output(changed)
+        inp.connect_to_output(unchanged)
+        pipeline = Pipeline(nodes={0: inp, 1: changed, 2: unchanged})
+        pipeline.run(incremental=True)
+        inp_result, changed_result, unchanged_result = inp._result, changed._result, unchanged._result
+        changed.parameters["arg3"] = True
+        pipeline.run(incremental=True)
+        # Only the node whose parameters changed is rerun
+        self.assertIs(inp._result, inp_result)
+        self.assertIs(unchanged._result, unchanged_result)
+        self.assertIsNot(changed._result, changed_result)
+        self.assertEqual(changed.result, [3, 6, 9])
+        return
+
+    def test_incremental_run_inplace(self):
+        inp = SampleInput()
+        changed = SampleAppendNode()
+        unchanged = SampleAppendNode()
+        inp.connect_to_output(changed)
+        inp.connect_to_output(unchanged)
+        pipeline = Pipeline(nodes={0: inp, 1: changed, 2: unchanged})
+        for first_incremental in [False, True]:
+            pipeline.reset()
+            pipeline.run(incremental=first_incremental)
+            changed.parameters["arg"] = first_incremental
+            pipeline.run(incremental=True)
+            # The branches modify their input in place; the rerun branch shouldn't see the other branch's changes
+            self.assertEqual(changed.result, [1, 2, 3, 4])
+            self.assertEqual(unchanged.result, [1, 2, 3, 4])
+        return
+
+    def test_node_pool(self):
+        inp = SampleInput.acquire(transpose=True)
+        pnode = SampleNodeTriple.acquire()
+        inp.connect_to_output(pnode)
+        inp.nodeId = 0
+        pipeline = Pipeline(nodes={0: inp, 1: pnode})
+        pipeline.run()
+        pipeline.release()
+        # Released nodes are reused, without their previous state
+        reused = SampleInput.acquire()
+        self.assertIs(reused, inp)
+        self.assertFalse(reused.parameters["transpose"])
+        self.assertEqual(len(reused._next), 0)
+        self.assertIsNone(reused.result)
+        self.assertFalse(hasattr(reused, "nodeId"))
+        return
+
 class SampleInput(InputNode):
     important_parameters = ["transpose"]
 
@@ -129,6 +425,90 @@ class SampleOutput(OutputNode):
         return
 
 
+class SampleEffectNode(PipelineNode):
+    """Node that declares an effect."""
+    effects = InteractionList(obs=["effect"])
+
+    def run(self):
+        self._terminate(self._previous[0].result)
+        return
+
+
+class SampleParameterEffectNode(PipelineNode):
+    """Node whose effect depends on its parameter."""
+    effects = InteractionList(obs=["col_param[arg]"])
+
+    def __init__(self, arg=None):
+        super().__init__()
+        self.store_vars_as_parameters(**vars())
+        return
+
+    def run(self):
+        self._terminate(self._previous[0].result)
+        return
+
+
+class SampleSlottedNode(PipelineNode):
+    """Node that declares __slots__."""
+    __slots__ = ()
+
+    def run(self):
+        self._terminate(self._previous[0].result)
+        return
+
+
+class SampleSlottedEffectNode(SampleEffectNode):
+    """Node that declares __slots__ and an effect."""
+    __slots__ = ()
+
+
+class SampleRequirementNode(PipelineNode):
+    """Node that requires the effect of SampleEffectNode."""
+    requirements = InteractionList(obs=["effect"])
+
+    def run(self):
+        self._terminate(self._previous[0].result)
+        return
+
+
+class SampleAppendNode(PipelineNode):
+    """Node that modifies its input in place."""
+    def run(self):
+        data = self._previous[0].result
+        data.append(4)
+        self._terminate(data)
+        return
+
+
+class SamplePairNode(PipelineNode):
+    """Node that modifies its first input and returns both of them."""
+    num_inputs = 2
+
+    def run(self):
+        first = self.input_data[0]
+        first.append(0)
+        self._terminate([first, self.input_data[1]])
+        return
+
+
+class SampleRangeInput(InputNode):
+    """Input node producing a list large enough that copying it takes a while."""
+    def run(self):
+        self._terminate(list(range(200000)))
+        return
+
+
+class SampleOverwriteNode(PipelineNode):
+    """Node that overwrites its input in place; records how many entries were already overwritten when it got it."""
+    def run(self):
+        data = self._previous[0].result
+        self.overwritten_seen = data.count(-1)
+        for i in range(len(data)):
+            data[i] = -1
+        self._terminate(data)
+        return
+
+
 class ExceptionNode(PipelineNode):
     """Node that raises an exception when run."""
     def __init__(self, results: str = None):
@@ -1,8 +1,12 @@
 import unittest
 from typing import Optional, Collection
-from pscs_api.node_parser import parse_package
+from pscs_api.node_parser import parse_package, find_unique_name, get_node_parameters
+from pscs_api.node_parser import load_from_nodes, initialize_pipeline, identify_connections
+from pscs_api.base import PipelineNode, InputNode, OutputNode
 import tempfile
 import os
+import json
+import math
 
 
 class TestNodeParser(unittest.TestCase):
@@ -22,3 +26,182 @@ class TestNodeParser(unittest.TestCase):
                       package_name="sample_package",
                       display_name="Sample package")
         return
+
+    def test_parsepackage_workers(self):
+        cur_dir = os.path.dirname(__file__)
+        outputs = []
+        for max_workers, use_threads in [(1, False), (2, True), (2, False)]:
+            tmp_f, tmp_name = tempfile.mkstemp(suffix="pscsapitest.json")
+            parse_package(tmp_name,
+                          parse_directory=os.path.join(cur_dir, "sample_package"),
+                          package_name="sample_package",
+                          max_workers=max_workers,
+                          use_threads=use_threads)
+            with open(tmp_name) as f:
+                outputs.append(json.load(f))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+        return
+
+    def test_parsepackage_defaults(self):
+        # Defaults that JSON can only represent loosely must be written the same way as the json module does
+        tmp_f, tmp_name = tempfile.mkstemp(suffix="pscsapitest.json")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "values.py"), "w") as f:
+                f.write(VALUE_NODE_SOURCE)
+            parse_package(tmp_name, parse_directory=tmp_dir, package_name="values_package")
+        with open(tmp_name) as f:
+            package = json.load(f)
+        defaults = {p["name"]: p["default"] for p in package["modules"]["modules"][0]["nodes"][0]["parameters"]}
+        self.assertEqual(defaults["mapping"], {"1": "a"})
+        self.assertEqual(defaults["big"], 2 ** 70)
+        self.assertTrue(math.isnan(defaults["ratio"]))
+        return
+
+    def test_node_parameter_types(self):
+        # Equal annotations written differently keep their own spelling
+        self.assertEqual(get_node_parameters(OptionalNode)["parameters"][0]["type"], str(Optional[int]))
+        self.assertEqual(get_node_parameters(UnionNode)["parameters"][0]["type"], str(int | None))
+        return
+
+    def test_load_from_nodes(self):
+        node_dict = load_from_nodes(SAMPLE_PIPELINE)
+        self.assertEqual(sorted(node_dict), ["n1.0", "n2.0", "n3.0"])
+        inp, scale, outp = node_dict["n1.0"], node_dict["n2.0"], node_dict["n3.0"]
+        self.assertIsInstance(inp, LoadInput)
+        self.assertIsInstance(scale, ScaleNode)
+        self.assertIsInstance(outp, SaveOutput)
+        self.assertEqual(scale.nodeId, "n2.0")
+        self.assertEqual(scale.parameters["factor"], 3)
+        self.assertEqual(inp._next, [scale])
+        self.assertEqual(scale._next, [outp])
+        self.assertEqual(outp._previous, [scale])
+        return
+
+    def test_initialize_pipeline(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            pipeline = initialize_pipeline(SAMPLE_PIPELINE, input_files={"n1.0": "data.csv"}, output_dir=output_dir)
+            self.assertEqual(pipeline.pipeline["n1.0"].parameters["path"], "data.csv")
+            pipeline.run()
+            with open(os.path.join(output_dir, "result.txt")) as f:
+                self.assertEqual(f.read(), "[3, 6, 9]")
+        return
+
+    def test_load_missing_class(self):
+        with open(SAMPLE_PIPELINE) as f:
+            pipeline = json.load(f)
+        pipeline["nodes"][0]["procName"] = "MissingNode"
+        tmp_f, tmp_name = tempfile.mkstemp(suffix="pscsapitest.json")
+        with open(tmp_name, "w") as f:
+            json.dump(pipeline, f)
+        self.assertRaises(ValueError, load_from_nodes, tmp_name)
+        return
+
+    def test_identify_connections(self):
+        self.assertEqual(identify_connections({"srcConnectors": ["c-n2.0-n3.0"], "dstConnectors": ["c-n1.0-n2.0"]}),
+                         ("n2.0", ["n3.0"], ["n1.0"]))
+        self.assertRaises(ValueError, identify_connections, {"srcConnectors": ["c-n2.0"], "dstConnectors": []})
+        self.assertRaises(ValueError, identify_connections, {"srcConnectors": [], "dstConnectors": []})
+        return
+
+    def test_find_unique_name_counts(self):
+        d = {"node": 0, "node_0": 0}
+        counts = {}
+        self.assertEqual(find_unique_name(d, "node", counts), "node_1")
+        d["node_1"] = 0
+        self.assertEqual(find_unique_name(d, "node", counts), "node_2")
+        self.assertEqual(counts["node"], 3)
+        self.assertEqual(find_unique_name(d, "node"), "node_2")  # without counts, every suffix is probed
+        return
+
+    def test_node_parameters(self):
+        first = get_node_parameters(ParentNode)
+        first["type"] = "simo"  # callers add their own entries; these shouldn't leak into later calls
+        self.assertNotIn("type", get_node_parameters(ParentNode))
+        self.assertEqual(first["required_parameters"], ["a"])
+        self.assertEqual(get_node_parameters(ChildNode)["required_parameters"], ["b"])  # not the parent's description
+        return
+
+
+class ParentNode(PipelineNode):
+    def __init__(self, a: int):
+        super().__init__()
+        return
+
+    def run(self):
+        return
+
+
+class ChildNode(ParentNode):
+    def __init__(self, b: str, c: int = 1):
+        super().__init__(a=c)
+        return
+
+
+# Export of the pipeline LoadInput -> ScaleNode -> SaveOutput
+SAMPLE_PIPELINE = os.path.join(os.path.dirname(__file__), "sample_pipeline.json")
+
+
+class LoadInput(InputNode):
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.store_vars_as_parameters(**vars())
+        return
+
+    def run(self):
+        self._terminate([1, 2, 3])  # this would normally be loaded from self.parameters["path"]
+        return
+
+
+class ScaleNode(PipelineNode):
+    def __init__(self, factor: int = 1):
+        super().__init__()
+        self.store_vars_as_parameters(**vars())
+        return
+
+    def run(self):
+        self._terminate([d*self.parameters["factor"] for d in self._previous[0].result])
+        return
+
+
+class SaveOutput(OutputNode):
+    def __init__(self, save: str = "output.txt"):
+        super().__init__()
+        self.store_vars_as_parameters(**vars())
+        return
+
+    def run(self):
+        with open(self.parameters["save"], "w") as f:
+            f.write(str(self._previous[0].result))
+        return
+
+
+VALUE_NODE_SOURCE = """from pscs_api.base import PipelineNode
+
+
+class ValueNode(PipelineNode):
+    def __init__(self, mapping: dict = {1: "a"}, big: int = 2 ** 70, ratio: float = float("nan")):
+        super().__init__()
+        return
+
+    def run(self):
+        return
+"""
+
+
+class OptionalNode(PipelineNode):
+    def __init__(self, a: Optional[int] = None):
+        super().__init__()
+        return
+
+    def run(self):
+        return
+
+
+class UnionNode(PipelineNode):
+    def __init__(self, a: int | None = None):
+        super().__init__()
+        return
+
+    def run(self):
+        return